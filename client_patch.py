@@ -12,15 +12,53 @@ get_client() will work correctly in multi-user mode.
 
 from __future__ import annotations
 
+import hashlib
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from contextvars import ContextVar
+from typing import Callable
 
 from linkedin_sdk import LinkedInClient
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 _request_client: ContextVar[LinkedInClient | None] = ContextVar(
     "_request_client", default=None
 )
 
+# LinkedInClient holds its own httpx connection pools, so clients are reused
+# across requests for the same credentials.  Keys are hashed so raw bearer
+# tokens are never retained as dict keys.
+_CLIENT_CACHE_SIZE = 512
+_client_cache: OrderedDict[bytes, LinkedInClient] = OrderedDict()
+_client_cache_lock = threading.Lock()
+
+
+def _key(token: str, pid: str | None) -> bytes:
+    """Return a short fixed-size cache key for a (token, person_id) pair."""
+    return hashlib.blake2b(
+        (token + "\x00" + (pid or "")).encode(), digest_size=16
+    ).digest()
+
+
+def _get_client(access_token: str, person_id: str | None = None) -> LinkedInClient:
+    """Return a cached LinkedInClient for these credentials, creating it if needed."""
+    key = _key(access_token, person_id)
+    evicted = None
+    with _client_cache_lock:
+        client = _client_cache.get(key)
+        if client is not None:
+            _client_cache.move_to_end(key)
+            return client
+        client = LinkedInClient(access_token=access_token, person_id=person_id)
+        _client_cache[key] = client
+        if len(_client_cache) > _CLIENT_CACHE_SIZE:
+            _, evicted = _client_cache.popitem(last=False)
+    if evicted is not None:
+        # Release the evicted client's connection pools instead of waiting for GC.
+        evicted.close()
+    return client
+
 
 def patched_get_client() -> LinkedInClient:
     """Return the per-request LinkedInClient set by the OAuth flow."""
@@ -33,23 +71,56 @@ def patched_get_client() -> LinkedInClient:
 
 
 def set_client_for_request(access_token: str, person_id: str | None = None) -> None:
-    """Create a LinkedInClient with the given access token and set it on the contextvar."""
-    client = LinkedInClient(access_token=access_token, person_id=person_id)
-    _request_client.set(client)
+    """Set the cached LinkedInClient for the given access token on the contextvar."""
+    _request_client.set(_get_client(access_token, person_id))
 
 
 @contextmanager
 def client_context(access_token: str, person_id: str | None = None):
     """Context manager that sets up a per-request LinkedInClient."""
-    token = _request_client.set(
-        LinkedInClient(access_token=access_token, person_id=person_id)
-    )
+    token = _request_client.set(_get_client(access_token, person_id))
     try:
         yield
     finally:
         _request_client.reset(token)
 
 
+class ClientContextMiddleware:
+    """ASGI middleware that scopes a LinkedInClient to each authenticated request.
+
+    ``lookup`` maps the request's bearer token to ``(access_token, person_id)``
+    for LinkedIn, or None if the token is unknown.  The client is set via
+    client_context() and reset when the request finishes, so it can never
+    leak into another request handled by the same task.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        lookup: Callable[[str], tuple[str, str | None] | None],
+    ) -> None:
+        self.app = app
+        self.lookup = lookup
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        creds = None
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        creds = self.lookup(token)
+                    break
+
+        if creds is None:
+            await self.app(scope, receive, send)
+            return
+
+        access_token, person_id = creds
+        with client_context(access_token=access_token, person_id=person_id):
+            await self.app(scope, receive, send)
+
+
 def apply_patch() -> None:
     """Replace get_client in linkedin_mcp_scheduler.server."""
     import linkedin_mcp_scheduler.server
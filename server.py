@@ -4,13 +4,20 @@ with OAuth and serves it over Streamable HTTP using mcp-remote-auth.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import json
 import logging
 import os
 import sys
-import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timezone
 
+import httpx
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import Response
 
 load_dotenv()
 
@@ -26,6 +33,24 @@ HOST = os.environ.get("HOST", "127.0.0.1")
 PORT = int(os.environ.get("PORT", "8002"))
 ONBOARD_SECRET = os.environ.get("ONBOARD_SECRET", "")
 DATA_DIR = os.environ.get("DATA_DIR", "data")
+ENABLE_DAEMON = os.environ.get("ENABLE_DAEMON", "1").strip().lower() not in (
+    "0",
+    "false",
+    "no",
+    "off",
+)
+
+MCP_RESOURCE_URL = f"{BASE_URL.rstrip('/')}/mcp"
+ISSUER_URL = f"{BASE_URL.rstrip('/')}/"
+_PROTECTED_RESOURCE_BODY = {
+    "resource": MCP_RESOURCE_URL,
+    "authorization_servers": [ISSUER_URL],
+}
+
+# Fixed response bodies for the discovery/health endpoints, encoded once.
+_HEALTH_BYTES = b'{"status":"ok"}'
+_PROTECTED_RESOURCE_BYTES = json.dumps(_PROTECTED_RESOURCE_BODY, separators=(",", ":")).encode()
+
 
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 logger = logging.getLogger(__name__)
@@ -35,7 +60,7 @@ logger = logging.getLogger(__name__)
 #    (linkedin_mcp_scheduler registers tools at import time)
 # ---------------------------------------------------------------------------
 
-from client_patch import apply_patch, set_client_for_request  # noqa: E402
+from client_patch import ClientContextMiddleware, _get_client, apply_patch  # noqa: E402
 
 apply_patch()
 
@@ -61,9 +86,80 @@ from mcp_remote_auth import (  # noqa: E402
 )
 
 
-def _setup_linkedin_client(token_data, config):
-    """Inject a per-request LinkedInClient from the stored access token."""
-    set_client_for_request(access_token=token_data["linkedin_access_token"])
+def _new_http_client() -> httpx.AsyncClient:
+    """One keep-alive pool for the OAuth token exchange and userinfo calls to
+    LinkedIn, instead of a fresh TLS connection per callback."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        timeout=10.0,
+    )
+
+
+class LinkedInOAuthProvider(OAuthProxyProvider):
+    """OAuthProxyProvider that sends upstream LinkedIn calls over a shared HTTP client.
+
+    The two overrides are trimmed copies of mcp_remote_auth 0.1's private
+    _exchange_code_with_upstream and _resolve_identity, kept to LinkedIn's
+    flow: form-POST token exchange only (no json_basic_auth branch) and
+    identity from the userinfo endpoint only (no
+    extract_identity_from_token_response fallback). mcp-remote-auth is pinned
+    to 0.1.x because of this; re-check both methods when bumping it.
+    """
+
+    # Owned by the app's lifespan (see _attach_lifespan), which sets it on
+    # startup and clears it on shutdown.
+    http_client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self.http_client is None:
+            raise RuntimeError(
+                "LinkedIn HTTP client not available — is the app lifespan running?"
+            )
+        return self.http_client
+
+    async def _exchange_code_with_upstream(self, code: str, redirect_uri: str) -> dict:
+        cfg = self.config
+        resp = await self._http().post(
+            cfg.token_url,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": redirect_uri,
+                "client_id": cfg.client_id,
+                "client_secret": cfg.client_secret,
+            },
+        )
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            logger.error(
+                "%s token exchange failed: %s %s",
+                cfg.provider_name,
+                exc.response.status_code,
+                exc.response.text,
+            )
+            raise ValueError(
+                f"Failed to exchange authorization code with {cfg.provider_name}"
+            ) from exc
+        return resp.json()
+
+    async def _resolve_identity(self, upstream_data: dict) -> str | None:
+        cfg = self.config
+        access_token = upstream_data.get("access_token")
+        if cfg.user_info_url and access_token:
+            resp = await self._http().get(
+                cfg.user_info_url,
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            try:
+                resp.raise_for_status()
+                identity = resp.json().get(cfg.user_info_identity_field)
+                if identity:
+                    return str(identity)
+            except Exception:
+                logger.warning("Failed to fetch user info from %s", cfg.user_info_url)
+        return None
 
 
 config = ProviderConfig(
@@ -79,74 +175,194 @@ config = ProviderConfig(
     upstream_refresh_key="linkedin_refresh_token",
     upstream_response_refresh_field="refresh_token",
     access_token_lifetime=31536000,
-    setup_client_for_request=_setup_linkedin_client,
     user_info_url="https://api.linkedin.com/v2/userinfo",
     user_info_identity_field="email",
     onboard_extra_scopes="openid email",
 )
 
 store = TokenStore(secret=SESSION_SECRET, data_dir=DATA_DIR)
-provider = OAuthProxyProvider(store=store, config=config)
+provider = LinkedInOAuthProvider(store=store, config=config)
 
 # ---------------------------------------------------------------------------
-# 3.5. Start publisher daemon in background thread
+# 3.5. Publisher daemon (runs as an asyncio task on the server's event loop)
 # ---------------------------------------------------------------------------
 
 import linkedin_mcp_scheduler.daemon as _daemon_module  # noqa: E402
 import linkedin_mcp_scheduler.db as _db_module  # noqa: E402
 
-# Give the daemon thread its own SQLite connection via thread-local storage.
-# The MCP server (main thread) uses the default get_db() singleton; the daemon
-# thread gets a separate ScheduledPostsDB instance. SQLite handles file-level
-# locking between connections, so no shared-connection threading issues arise.
-_thread_local = threading.local()
+# Give the daemon worker its own SQLite connection via a ContextVar. The MCP
+# server (event loop thread) uses the default get_db() singleton; the daemon
+# worker gets a separate ScheduledPostsDB instance. Executor threads run jobs
+# in their own context, so the value set on the daemon worker persists across
+# ticks and is never visible to coroutines on the event loop. SQLite handles
+# file-level locking between connections, so no shared-connection threading
+# issues arise.
+_db_var: ContextVar[_db_module.ScheduledPostsDB | None] = ContextVar("_db_var", default=None)
+
+# WAL lets MCP tool reads proceed while the daemon writes; the rest trade
+# per-commit fsyncs and disk temp files for memory.
+_SQLITE_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=134217728;
+PRAGMA cache_size=-20000;
+PRAGMA busy_timeout=5000;
+"""
+
 
+def _tune_db(db: _db_module.ScheduledPostsDB) -> _db_module.ScheduledPostsDB:
+    mode = db._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if mode.lower() != "wal":
+        logger.warning("SQLite journal_mode is %s, not WAL (%s)", mode, db._db_path)
+    db._conn.executescript(_SQLITE_PRAGMAS)
+    return db
 
-def _thread_local_get_db(db_path: str | None = None) -> _db_module.ScheduledPostsDB:
+
+def _daemon_get_db(db_path: str | None = None) -> _db_module.ScheduledPostsDB:
     resolved = db_path or _db_module.DB_PATH
-    db = getattr(_thread_local, "db", None)
+    db = _db_var.get()
     if db is not None and db._db_path != resolved:
         db.close()
         db = None
     if db is None:
-        db = _db_module.ScheduledPostsDB(resolved)
-        _thread_local.db = db
+        db = _tune_db(_db_module.ScheduledPostsDB(resolved))
+        _db_var.set(db)
     return db
 
 
-_daemon_module.get_db = _thread_local_get_db
+_daemon_module.get_db = _daemon_get_db
 
 
 def _build_client_from_store():
-    from linkedin_sdk import LinkedInClient
-
     creds = store.get_any_upstream_token("linkedin_access_token")
     if not creds:
         raise RuntimeError("No LinkedIn credentials in token store — authenticate via OAuth first")
     access_token, _ = creds
-    return LinkedInClient(access_token=access_token)
+    return _get_client(access_token)
 
 
 _daemon_module._build_client = _build_client_from_store
 
 
-def _daemon_loop():
+def _close_daemon_db() -> None:
+    db = _db_var.get()
+    if db is not None:
+        db.close()
+        _db_var.set(None)
+
+
+def _seconds_until_next_due(poll_interval: int) -> float:
+    """Return how long to sleep before the next tick.
+
+    Wakes up when the earliest pending post is due (at least 1s away) rather
+    than always waiting a full poll interval.
+
+    get_due() compares the stored ISO strings as text against a UTC "now", so
+    posts stored with a non-UTC offset can be past due here yet not picked up
+    by it (and text MIN() is not the true minimum across offsets). A post that
+    should already have been published therefore never shortens the sleep;
+    the daemon falls back to the normal poll interval instead of spinning.
+    """
+    row = _daemon_get_db()._conn.execute(
+        "SELECT MIN(scheduled_time) FROM scheduled_posts WHERE status = 'pending'"
+    ).fetchone()
+    if row[0] is None:
+        return poll_interval
+    due = datetime.fromisoformat(row[0].replace("Z", "+00:00"))
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    delay = (due - datetime.now(timezone.utc)).total_seconds()
+    if delay <= 0:
+        return poll_interval
+    return min(poll_interval, max(1, delay))
+
+
+# Upper bound for the daemon's exponential backoff after repeated errors.
+_MAX_DAEMON_BACKOFF = 3600
+
+
+async def _daemon_async_loop(executor: ThreadPoolExecutor):
     poll_interval = int(os.environ.get("POLL_INTERVAL_SECONDS", "60"))
     logger.info("Publisher daemon started (poll interval: %ds)", poll_interval)
+    loop = asyncio.get_running_loop()
+    consecutive_failures = 0
     while True:
+        delay = poll_interval
         try:
-            _daemon_module.run_once()
+            await loop.run_in_executor(executor, _daemon_module.run_once)
         except RuntimeError as e:
-            # Expected when no user has authenticated yet (_build_client_from_store raises)
+            # Expected when no user has authenticated yet (_build_client_from_store raises).
+            # Not backed off, so posts go out promptly once someone authenticates.
             logger.debug("Daemon skipped: %s", e)
         except Exception as e:
-            logger.error("Daemon error: %s", e)
-        time.sleep(poll_interval)
+            consecutive_failures += 1
+            delay = min(poll_interval * 2**consecutive_failures, _MAX_DAEMON_BACKOFF)
+            logger.error("Daemon error (retrying in %ds): %s", delay, e)
+        else:
+            consecutive_failures = 0
+            try:
+                delay = await loop.run_in_executor(executor, _seconds_until_next_due, poll_interval)
+            except Exception as e:
+                logger.warning("Could not compute next due time: %s", e)
+        await asyncio.sleep(delay)
+
+
+def _attach_lifespan(app):
+    """Wrap the Starlette app's lifespan with DB setup, the shared HTTP client
+    and the publisher daemon.
+
+    Only the resources started here (HTTP client, daemon executor and its DB
+    connection) are created per lifespan. FastMCP's session manager allows a
+    single run, so the app itself can only be started once.
+    """
+    mcp_lifespan = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with mcp_lifespan(app), _new_http_client() as http_client:
+            provider.http_client = http_client
+            loop = asyncio.get_running_loop()
+            executor = None
+            app.state.daemon = None
+            try:
+                # MCP tools run on the event loop thread and share get_db()'s singleton.
+                _tune_db(_db_module.get_db())
+                if ENABLE_DAEMON:
+                    # run_once() is blocking (SQLite + LinkedIn HTTP), so it is
+                    # dispatched to a single dedicated worker thread. sqlite3
+                    # connections are bound to the thread that created them, so
+                    # the daemon's connection must always be used from that thread.
+                    executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="publisher-daemon"
+                    )
+                    # Open the daemon's connection up front so the first tick doesn't
+                    # pay the SQLite connect + schema setup cost.
+                    await loop.run_in_executor(executor, _daemon_get_db)
+                    app.state.daemon = asyncio.create_task(_daemon_async_loop(executor))
+                else:
+                    logger.info(
+                        "Publisher daemon disabled (ENABLE_DAEMON=%s)",
+                        os.environ.get("ENABLE_DAEMON"),
+                    )
+                yield
+            finally:
+                if app.state.daemon is not None:
+                    app.state.daemon.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await app.state.daemon
+                    logger.info("Publisher daemon stopped")
+                if executor is not None:
+                    # Queued behind any run_once() still in flight on the worker.
+                    await loop.run_in_executor(executor, _close_daemon_db)
+                    executor.shutdown(wait=False)
+                provider.http_client = None
+                # Close get_db()'s singleton on the event loop thread that
+                # opened it, so no connection outlives the app.
+                _db_module.reset_db()
+
+    app.router.lifespan_context = lifespan
 
 
-_daemon_thread = threading.Thread(target=_daemon_loop, daemon=True, name="publisher-daemon")
-_daemon_thread.start()
-
 # ---------------------------------------------------------------------------
 # 4. Wire up auth, transport, routes
 # ---------------------------------------------------------------------------
@@ -156,10 +372,45 @@ mcp.settings.host = HOST
 mcp.settings.port = PORT
 mcp.settings.stateless_http = True
 configure_transport_security(mcp, BASE_URL, os.environ.get("ADDITIONAL_ALLOWED_HOSTS", ""))
+# Host headers are checked against this list on every request. The MCP SDK
+# types it as list[str] (and also scans it for "host:*" patterns), so it
+# stays a list; the strings are interned once here.
+if mcp.settings.transport_security and mcp.settings.transport_security.allowed_hosts:
+    mcp.settings.transport_security.allowed_hosts = [
+        sys.intern(h) for h in mcp.settings.transport_security.allowed_hosts
+    ]
+
+
+# Registered before register_standard_routes so they take precedence over the
+# generic handlers, which re-serialize the same JSON on every request.
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> Response:
+    return Response(_HEALTH_BYTES, media_type="application/json")
+
+
+@mcp.custom_route("/.well-known/oauth-protected-resource", methods=["GET"])
+async def oauth_protected_resource(request: Request) -> Response:
+    """RFC 9728 -- Protected Resource Metadata for MCP clients."""
+    return Response(_PROTECTED_RESOURCE_BYTES, media_type="application/json")
+
+
 register_standard_routes(mcp, provider, BASE_URL)
 register_onboarding_routes(mcp, provider, store, config, ONBOARD_SECRET)
 
 
+def _lookup_linkedin_credentials(token: str) -> tuple[str, str | None] | None:
+    """Resolve an MCP bearer token to the user's LinkedIn access token."""
+    data = store.get_access_token(token)
+    if data is None:
+        return None
+    return data["linkedin_access_token"], None
+
+
+app = build_app_with_middleware(mcp, use_body_inspection=True)
+app.add_middleware(ClientContextMiddleware, lookup=_lookup_linkedin_credentials)
+_attach_lifespan(app)
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
@@ -169,8 +420,7 @@ def main():
     import uvicorn  # noqa: E402
 
     logger.info("Starting linkedin-scheduler-remote on %s:%d", HOST, PORT)
-    app = build_app_with_middleware(mcp, use_body_inspection=True)
-    uvicorn.run(app, host=HOST, port=PORT)
+    uvicorn.run(app, host=HOST, port=PORT, lifespan="on")
 
 
 if __name__ == "__main__":